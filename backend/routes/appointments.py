@@ -1,8 +1,12 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Response
 from database import get_db
 from models.schemas import AppointmentCreate, AppointmentUpdate
+from utils.etag import (
+    bump_list_version, if_match_filter, not_modified, raise_write_failed, set_etag,
+)
 from utils.serializers import serialize_doc, serialize_list
 from bson import ObjectId
+from pymongo import ReturnDocument
 
 router = APIRouter(prefix="/patients/{patient_id}/appointments", tags=["Appointments"])
 
@@ -14,15 +18,27 @@ def valid_oid(id, label="ID"):
 
 
 @router.get("")
-async def list_appointments(patient_id: str):
+async def list_appointments(patient_id: str, request: Request, response: Response):
     db = get_db()
-    valid_oid(patient_id, "patient ID")
+    patient = await db.patients.find_one(
+        {"_id": valid_oid(patient_id, "patient ID")}, {"appointments_version": 1}
+    )
+    # An unknown patient keeps returning an empty list, tagged as version 0
+    version = patient.get("appointments_version") if patient else 0
+
+    # Read the list version before the list itself so a concurrent write can
+    # only make the ETag older than the body, never newer
+    cached = not_modified(request, version)
+    if cached:
+        return cached
+
     appointments = await db.appointments.find({"patient_id": patient_id}).to_list(1000)
+    set_etag(response, version)
     return serialize_list(appointments)
 
 
 @router.post("", status_code=201)
-async def create_appointment(patient_id: str, body: AppointmentCreate):
+async def create_appointment(patient_id: str, body: AppointmentCreate, response: Response):
     db = get_db()
     patient = await db.patients.find_one({"_id": valid_oid(patient_id, "patient ID")})
     if not patient:
@@ -34,15 +50,21 @@ async def create_appointment(patient_id: str, body: AppointmentCreate):
         "datetime": body.datetime,
         "repeat": body.repeat,
         "end_date": body.end_date,
+        "version": 1,
     }
 
     result = await db.appointments.insert_one(doc)
+    await bump_list_version(db, patient_id, "appointments_version")
     doc["_id"] = str(result.inserted_id)
+    set_etag(response, doc["version"])
     return doc
 
 
 @router.put("/{appointment_id}")
-async def update_appointment(patient_id: str, appointment_id: str, body: AppointmentUpdate):
+async def update_appointment(
+    patient_id: str, appointment_id: str, body: AppointmentUpdate,
+    request: Request, response: Response,
+):
     db = get_db()
     oid = valid_oid(appointment_id, "appointment ID")
 
@@ -59,21 +81,30 @@ async def update_appointment(patient_id: str, appointment_id: str, body: Appoint
     if not update:
         raise HTTPException(status_code=400, detail="No fields to update")
 
-    result = await db.appointments.update_one(
-        {"_id": oid, "patient_id": patient_id}, {"$set": update}
+    query = {"_id": oid, "patient_id": patient_id}
+    appt = await db.appointments.find_one_and_update(
+        {**query, **if_match_filter(request)},
+        {"$set": update, "$inc": {"version": 1}},
+        return_document=ReturnDocument.AFTER,
     )
-    if result.matched_count == 0:
-        raise HTTPException(status_code=404, detail="Appointment not found")
+    if not appt:
+        await raise_write_failed(db.appointments, query, "Appointment")
 
-    appt = await db.appointments.find_one({"_id": oid})
+    await bump_list_version(db, patient_id, "appointments_version")
+    set_etag(response, appt["version"])
     return serialize_doc(appt)
 
 
 @router.delete("/{appointment_id}")
-async def delete_appointment(patient_id: str, appointment_id: str):
+async def delete_appointment(patient_id: str, appointment_id: str, request: Request):
     db = get_db()
     oid = valid_oid(appointment_id, "appointment ID")
-    result = await db.appointments.delete_one({"_id": oid, "patient_id": patient_id})
-    if result.deleted_count == 0:
-        raise HTTPException(status_code=404, detail="Appointment not found")
+    query = {"_id": oid, "patient_id": patient_id}
+    appt = await db.appointments.find_one_and_delete(
+        {**query, **if_match_filter(request)}, projection={"_id": 1}
+    )
+    if not appt:
+        await raise_write_failed(db.appointments, query, "Appointment")
+
+    await bump_list_version(db, patient_id, "appointments_version")
     return {"message": "Appointment deleted"}
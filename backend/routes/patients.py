@@ -1,12 +1,17 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Response
 from database import get_db
 from models.schemas import PatientCreate, PatientUpdate
 from utils.auth import hash_password
+from utils.etag import if_match_filter, not_modified, raise_write_failed, set_etag
 from utils.serializers import serialize_doc
 from bson import ObjectId
+from pymongo import ReturnDocument
 
 router = APIRouter(prefix="/patients", tags=["Patients"])
 
+# List versions only drive the appointment/prescription list ETags
+PATIENT_PROJECTION = {"password_hash": 0, "appointments_version": 0, "prescriptions_version": 0}
+
 
 def valid_oid(id):
     if not ObjectId.is_valid(id):
@@ -17,7 +22,7 @@ def valid_oid(id):
 @router.get("")
 async def list_patients():
     db = get_db()
-    patients = await db.patients.find({}, {"password_hash": 0}).to_list(1000)
+    patients = await db.patients.find({}, PATIENT_PROJECTION).to_list(1000)
 
     result = []
     for p in patients:
@@ -33,18 +38,23 @@ async def list_patients():
 
 
 @router.get("/{patient_id}")
-async def get_patient(patient_id: str):
+async def get_patient(patient_id: str, request: Request, response: Response):
     db = get_db()
     patient = await db.patients.find_one(
-        {"_id": valid_oid(patient_id)}, {"password_hash": 0}
+        {"_id": valid_oid(patient_id)}, PATIENT_PROJECTION
     )
     if not patient:
         raise HTTPException(status_code=404, detail="Patient not found")
+
+    cached = not_modified(request, patient.get("version"))
+    if cached:
+        return cached
+    set_etag(response, patient.get("version"))
     return serialize_doc(patient)
 
 
 @router.post("", status_code=201)
-async def create_patient(body: PatientCreate):
+async def create_patient(body: PatientCreate, response: Response):
     db = get_db()
 
     existing = await db.patients.find_one({"email": body.email})
@@ -55,16 +65,18 @@ async def create_patient(body: PatientCreate):
         "name": body.name,
         "email": body.email,
         "password_hash": hash_password(body.password),
+        "version": 1,
     }
 
     result = await db.patients.insert_one(doc)
     doc["_id"] = str(result.inserted_id)
     del doc["password_hash"]
+    set_etag(response, doc["version"])
     return doc
 
 
 @router.put("/{patient_id}")
-async def update_patient(patient_id: str, body: PatientUpdate):
+async def update_patient(patient_id: str, body: PatientUpdate, request: Request, response: Response):
     db = get_db()
     oid = valid_oid(patient_id)
 
@@ -82,9 +94,14 @@ async def update_patient(patient_id: str, body: PatientUpdate):
     if not update:
         raise HTTPException(status_code=400, detail="No fields to update")
 
-    result = await db.patients.update_one({"_id": oid}, {"$set": update})
-    if result.matched_count == 0:
-        raise HTTPException(status_code=404, detail="Patient not found")
+    patient = await db.patients.find_one_and_update(
+        {"_id": oid, **if_match_filter(request)},
+        {"$set": update, "$inc": {"version": 1}},
+        projection=PATIENT_PROJECTION,
+        return_document=ReturnDocument.AFTER,
+    )
+    if not patient:
+        await raise_write_failed(db.patients, {"_id": oid}, "Patient")
 
-    patient = await db.patients.find_one({"_id": oid}, {"password_hash": 0})
+    set_etag(response, patient["version"])
     return serialize_doc(patient)
@@ -1,8 +1,12 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Response
 from database import get_db
 from models.schemas import PrescriptionCreate, PrescriptionUpdate
+from utils.etag import (
+    bump_list_version, if_match_filter, not_modified, raise_write_failed, set_etag,
+)
 from utils.serializers import serialize_doc, serialize_list
 from bson import ObjectId
+from pymongo import ReturnDocument
 
 router = APIRouter(prefix="/patients/{patient_id}/prescriptions", tags=["Prescriptions"])
 
@@ -14,15 +18,27 @@ def valid_oid(id, label="ID"):
 
 
 @router.get("")
-async def list_prescriptions(patient_id: str):
+async def list_prescriptions(patient_id: str, request: Request, response: Response):
     db = get_db()
-    valid_oid(patient_id, "patient ID")
+    patient = await db.patients.find_one(
+        {"_id": valid_oid(patient_id, "patient ID")}, {"prescriptions_version": 1}
+    )
+    # An unknown patient keeps returning an empty list, tagged as version 0
+    version = patient.get("prescriptions_version") if patient else 0
+
+    # Read the list version before the list itself so a concurrent write can
+    # only make the ETag older than the body, never newer
+    cached = not_modified(request, version)
+    if cached:
+        return cached
+
     prescriptions = await db.prescriptions.find({"patient_id": patient_id}).to_list(1000)
+    set_etag(response, version)
     return serialize_list(prescriptions)
 
 
 @router.post("", status_code=201)
-async def create_prescription(patient_id: str, body: PrescriptionCreate):
+async def create_prescription(patient_id: str, body: PrescriptionCreate, response: Response):
     db = get_db()
     patient = await db.patients.find_one({"_id": valid_oid(patient_id, "patient ID")})
     if not patient:
@@ -35,15 +51,21 @@ async def create_prescription(patient_id: str, body: PrescriptionCreate):
         "quantity": body.quantity,
         "refill_on": body.refill_on,
         "refill_schedule": body.refill_schedule,
+        "version": 1,
     }
 
     result = await db.prescriptions.insert_one(doc)
+    await bump_list_version(db, patient_id, "prescriptions_version")
     doc["_id"] = str(result.inserted_id)
+    set_etag(response, doc["version"])
     return doc
 
 
 @router.put("/{prescription_id}")
-async def update_prescription(patient_id: str, prescription_id: str, body: PrescriptionUpdate):
+async def update_prescription(
+    patient_id: str, prescription_id: str, body: PrescriptionUpdate,
+    request: Request, response: Response,
+):
     db = get_db()
     oid = valid_oid(prescription_id, "prescription ID")
 
@@ -62,21 +84,30 @@ async def update_prescription(patient_id: str, prescription_id: str, body: Presc
     if not update:
         raise HTTPException(status_code=400, detail="No fields to update")
 
-    result = await db.prescriptions.update_one(
-        {"_id": oid, "patient_id": patient_id}, {"$set": update}
+    query = {"_id": oid, "patient_id": patient_id}
+    rx = await db.prescriptions.find_one_and_update(
+        {**query, **if_match_filter(request)},
+        {"$set": update, "$inc": {"version": 1}},
+        return_document=ReturnDocument.AFTER,
     )
-    if result.matched_count == 0:
-        raise HTTPException(status_code=404, detail="Prescription not found")
+    if not rx:
+        await raise_write_failed(db.prescriptions, query, "Prescription")
 
-    rx = await db.prescriptions.find_one({"_id": oid})
+    await bump_list_version(db, patient_id, "prescriptions_version")
+    set_etag(response, rx["version"])
     return serialize_doc(rx)
 
 
 @router.delete("/{prescription_id}")
-async def delete_prescription(patient_id: str, prescription_id: str):
+async def delete_prescription(patient_id: str, prescription_id: str, request: Request):
     db = get_db()
     oid = valid_oid(prescription_id, "prescription ID")
-    result = await db.prescriptions.delete_one({"_id": oid, "patient_id": patient_id})
-    if result.deleted_count == 0:
-        raise HTTPException(status_code=404, detail="Prescription not found")
+    query = {"_id": oid, "patient_id": patient_id}
+    rx = await db.prescriptions.find_one_and_delete(
+        {**query, **if_match_filter(request)}, projection={"_id": 1}
+    )
+    if not rx:
+        await raise_write_failed(db.prescriptions, query, "Prescription")
+
+    await bump_list_version(db, patient_id, "prescriptions_version")
     return {"message": "Prescription deleted"}
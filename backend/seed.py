@@ -112,17 +112,20 @@ async def seed():
             "name": user_data["name"],
             "email": user_data["email"],
             "password_hash": pwd_context.hash(user_data["password"]),
+            "version": 1,
+            "appointments_version": 1,
+            "prescriptions_version": 1,
         }
         result = await db.patients.insert_one(patient_doc)
         patient_id = str(result.inserted_id)
         print(f"  Created patient: {user_data['name']} ({user_data['email']})")
 
         for appt in user_data["appointments"]:
-            await db.appointments.insert_one({"patient_id": patient_id, **appt})
+            await db.appointments.insert_one({"patient_id": patient_id, "version": 1, **appt})
         print(f"    -> {len(user_data['appointments'])} appointments")
 
         for rx in user_data["prescriptions"]:
-            await db.prescriptions.insert_one({"patient_id": patient_id, **rx})
+            await db.prescriptions.insert_one({"patient_id": patient_id, "version": 1, **rx})
         print(f"    -> {len(user_data['prescriptions'])} prescriptions")
 
     # Seed reference data
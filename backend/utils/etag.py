@@ -0,0 +1,78 @@
+import logging
+
+from bson import ObjectId
+from fastapi import HTTPException, Request, Response
+
+logger = logging.getLogger(__name__)
+
+
+def make_etag(version):
+    return f'"{version or 0}"'
+
+
+def set_etag(response: Response, version):
+    response.headers["ETag"] = make_etag(version)
+    response.headers["Cache-Control"] = "private, no-cache"
+
+
+def _parse_tags(header):
+    return [tag.strip() for tag in header.split(",") if tag.strip()]
+
+
+def not_modified(request: Request, version):
+    """Return a 304 response if the client's cached copy is current, else None."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return None
+
+    etag = make_etag(version)
+    # If-None-Match uses weak comparison, so a W/ prefix is ignored
+    tags = [tag.removeprefix("W/") for tag in _parse_tags(header)]
+    if "*" in tags or etag in tags:
+        response = Response(status_code=304)
+        set_etag(response, version)
+        return response
+    return None
+
+
+def if_match_filter(request: Request):
+    """Translate an If-Match header into a Mongo filter on the document version."""
+    header = request.headers.get("if-match")
+    if header is None:
+        return {}
+
+    tags = _parse_tags(header)
+    if "*" in tags:
+        return {}
+
+    versions = []
+    for tag in tags:
+        # If-Match uses strong comparison, so weak tags never match
+        if tag.startswith("W/"):
+            continue
+        try:
+            versions.append(int(tag.strip('"')))
+        except ValueError:
+            continue
+
+    if not versions:
+        raise HTTPException(status_code=412, detail="Resource has been modified")
+    if 0 in versions:
+        # Documents created before versioning have no version field
+        versions.append(None)
+    return {"version": {"$in": versions}}
+
+
+async def raise_write_failed(collection, query, label):
+    """Raise 412 if the document exists but its version moved on, else 404."""
+    if await collection.find_one(query, {"_id": 1}):
+        raise HTTPException(status_code=412, detail=f"{label} has been modified")
+    raise HTTPException(status_code=404, detail=f"{label} not found")
+
+
+async def bump_list_version(db, patient_id, field):
+    # Must run after the item write so a list is never cached under a newer ETag
+    result = await db.patients.update_one({"_id": ObjectId(patient_id)}, {"$inc": {field: 1}})
+    if result.matched_count == 0:
+        # The item write already succeeded, so report the stale list ETag rather than fail
+        logger.warning("Could not bump %s for patient %s; list ETag is stale", field, patient_id)
@@ -58,7 +58,7 @@ export default function AppointmentForm({ isOpen, onClose, patientId, appointmen
       };
 
       if (isEditing) {
-        await appointmentsAPI.update(patientId, appointment._id || appointment.id, payload);
+        await appointmentsAPI.update(patientId, appointment._id || appointment.id, payload, appointment.version ?? 0);
         toast.success('Appointment updated');
       } else {
         await appointmentsAPI.create(patientId, payload);
@@ -67,6 +67,12 @@ export default function AppointmentForm({ isOpen, onClose, patientId, appointmen
       onSaved();
       onClose();
     } catch (err) {
+      if (err.response?.status === 412) {
+        toast.error('This appointment was changed by someone else. Reloaded latest data.');
+        onSaved();
+        onClose();
+        return;
+      }
       toast.error(err.response?.data?.detail || 'Failed to save appointment');
     } finally {
       setSaving(false);
@@ -72,7 +72,7 @@ export default function PrescriptionForm({ isOpen, onClose, patientId, prescript
       };
 
       if (isEditing) {
-        await prescriptionsAPI.update(patientId, prescription._id || prescription.id, payload);
+        await prescriptionsAPI.update(patientId, prescription._id || prescription.id, payload, prescription.version ?? 0);
         toast.success('Prescription updated');
       } else {
         await prescriptionsAPI.create(patientId, payload);
@@ -81,6 +81,12 @@ export default function PrescriptionForm({ isOpen, onClose, patientId, prescript
       onSaved();
       onClose();
     } catch (err) {
+      if (err.response?.status === 412) {
+        toast.error('This prescription was changed by someone else. Reloaded latest data.');
+        onSaved();
+        onClose();
+        return;
+      }
       toast.error(err.response?.data?.detail || 'Failed to save prescription');
     } finally {
       setSaving(false);
@@ -48,16 +48,22 @@ export default function PatientDetail() {
     setDeleting(true);
     try {
       if (deleteModal.type === 'appointment') {
-        await appointmentsAPI.delete(id, deleteModal.id);
+        await appointmentsAPI.delete(id, deleteModal.id, deleteModal.version);
         toast.success('Appointment deleted');
       } else {
-        await prescriptionsAPI.delete(id, deleteModal.id);
+        await prescriptionsAPI.delete(id, deleteModal.id, deleteModal.version);
         toast.success('Prescription deleted');
       }
       setDeleteModal({ open: false, type: null, id: null });
       fetchData();
-    } catch {
-      toast.error(`Failed to delete ${deleteModal.type}`);
+    } catch (err) {
+      if (err.response?.status === 412) {
+        toast.error(`This ${deleteModal.type} was changed by someone else. Reloaded latest data.`);
+        setDeleteModal({ open: false, type: null, id: null });
+        fetchData();
+      } else {
+        toast.error(`Failed to delete ${deleteModal.type}`);
+      }
     } finally {
       setDeleting(false);
     }
@@ -130,7 +136,7 @@ export default function PatientDetail() {
                   </div>
                   <div className="pd-item-actions">
                     <button onClick={() => setApptModal({ open: true, data: appt })} className="btn-ghost" title="Edit"><Pencil size={14} /></button>
-                    <button onClick={() => setDeleteModal({ open: true, type: 'appointment', id: aid })} className="btn-ghost pd-delete-btn" title="Delete"><Trash2 size={14} /></button>
+                    <button onClick={() => setDeleteModal({ open: true, type: 'appointment', id: aid, version: appt.version ?? 0 })} className="btn-ghost pd-delete-btn" title="Delete"><Trash2 size={14} /></button>
                   </div>
                 </div>
               );
@@ -176,7 +182,7 @@ export default function PatientDetail() {
                   </div>
                   <div className="pd-item-actions">
                     <button onClick={() => setRxModal({ open: true, data: rx })} className="btn-ghost" title="Edit"><Pencil size={14} /></button>
-                    <button onClick={() => setDeleteModal({ open: true, type: 'prescription', id: rid })} className="btn-ghost pd-delete-btn" title="Delete"><Trash2 size={14} /></button>
+                    <button onClick={() => setDeleteModal({ open: true, type: 'prescription', id: rid, version: rx.version ?? 0 })} className="btn-ghost pd-delete-btn" title="Delete"><Trash2 size={14} /></button>
                   </div>
                 </div>
               );
@@ -12,6 +12,7 @@ export default function PatientForm() {
   const navigate = useNavigate();
 
   const [form, setForm] = useState({ name: '', email: '', password: '' });
+  const [version, setVersion] = useState(null);
   const [loading, setLoading] = useState(isEditing);
   const [saving, setSaving] = useState(false);
   const [showPassword, setShowPassword] = useState(false);
@@ -21,7 +22,10 @@ export default function PatientForm() {
     if (isEditing) {
       patientsAPI
         .getById(id)
-        .then((res) => setForm({ name: res.data.name, email: res.data.email, password: '' }))
+        .then((res) => {
+          setForm({ name: res.data.name, email: res.data.email, password: '' });
+          setVersion(res.data.version ?? 0);
+        })
         .catch(() => toast.error('Failed to load patient'))
         .finally(() => setLoading(false));
     }
@@ -48,7 +52,7 @@ export default function PatientForm() {
       if (form.password) payload.password = form.password;
 
       if (isEditing) {
-        await patientsAPI.update(id, payload);
+        await patientsAPI.update(id, payload, version);
         toast.success('Patient updated');
         navigate(`/admin/patients/${id}`);
       } else {
@@ -57,6 +61,14 @@ export default function PatientForm() {
         navigate(`/admin/patients/${res.data._id || res.data.id}`);
       }
     } catch (err) {
+      if (err.response?.status === 412) {
+        toast.error('This patient was changed by someone else. Reloaded latest data.');
+        patientsAPI.getById(id).then((res) => {
+          setForm({ name: res.data.name, email: res.data.email, password: '' });
+          setVersion(res.data.version ?? 0);
+        }).catch(() => toast.error('Failed to load patient'));
+        return;
+      }
       toast.error(err.response?.data?.detail || 'Something went wrong');
     } finally {
       setSaving(false);
@@ -29,6 +29,11 @@ api.interceptors.response.use(
   }
 );
 
+// Optimistic concurrency: send the version the caller last saw so the API
+// rejects the write with 412 if someone else changed the record meanwhile
+const ifMatch = (version) =>
+  version == null ? {} : { headers: { 'If-Match': `"${version}"` } };
+
 export const authAPI = {
   login: (email, password) => api.post('/auth/login', { email, password }),
   me: () => api.get('/auth/me'),
@@ -38,25 +43,25 @@ export const patientsAPI = {
   getAll: () => api.get('/patients'),
   getById: (id) => api.get(`/patients/${id}`),
   create: (data) => api.post('/patients', data),
-  update: (id, data) => api.put(`/patients/${id}`, data),
+  update: (id, data, version) => api.put(`/patients/${id}`, data, ifMatch(version)),
 };
 
 export const appointmentsAPI = {
   getByPatient: (patientId) => api.get(`/patients/${patientId}/appointments`),
   create: (patientId, data) => api.post(`/patients/${patientId}/appointments`, data),
-  update: (patientId, appointmentId, data) =>
-    api.put(`/patients/${patientId}/appointments/${appointmentId}`, data),
-  delete: (patientId, appointmentId) =>
-    api.delete(`/patients/${patientId}/appointments/${appointmentId}`),
+  update: (patientId, appointmentId, data, version) =>
+    api.put(`/patients/${patientId}/appointments/${appointmentId}`, data, ifMatch(version)),
+  delete: (patientId, appointmentId, version) =>
+    api.delete(`/patients/${patientId}/appointments/${appointmentId}`, ifMatch(version)),
 };
 
 export const prescriptionsAPI = {
   getByPatient: (patientId) => api.get(`/patients/${patientId}/prescriptions`),
   create: (patientId, data) => api.post(`/patients/${patientId}/prescriptions`, data),
-  update: (patientId, prescriptionId, data) =>
-    api.put(`/patients/${patientId}/prescriptions/${prescriptionId}`, data),
-  delete: (patientId, prescriptionId) =>
-    api.delete(`/patients/${patientId}/prescriptions/${prescriptionId}`),
+  update: (patientId, prescriptionId, data, version) =>
+    api.put(`/patients/${patientId}/prescriptions/${prescriptionId}`, data, ifMatch(version)),
+  delete: (patientId, prescriptionId, version) =>
+    api.delete(`/patients/${patientId}/prescriptions/${prescriptionId}`, ifMatch(version)),
 };
 
 export const referenceAPI = {